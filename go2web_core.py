@@ -0,0 +1,529 @@
+"""Core implementation shared by the go2web CLI: HTTP fetching, caching,
+HTML cleaning and DuckDuckGo search."""
+import asyncio
+import email.parser
+import html
+import socket
+import ssl
+import re
+import time
+import urllib.parse
+import os
+import json
+import hashlib
+
+# Optional C-backed HTML parser (Modest engine); falls back to the pure-Python
+# scanner in _strip_tags when not installed
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Constant tail of every request, encoded once at import; per-call work is
+# reduced to encoding the path and host
+_REQ_SUFFIX = (
+    f"\r\nUser-Agent: {USER_AGENT}\r\n"
+    f"Accept: text/html, application/json, text/plain\r\n"
+    "Connection: keep-alive\r\n\r\n"
+).encode()
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".go2web_cache")
+CACHE_EXPIRATION = 600  # 10 minutes (600 seconds)
+MAX_REDIRECTS = 5
+DNS_TTL = 300  # 5 minutes
+
+# Resolved-address cache: host -> (timestamp, ip). Redirect chains and
+# search-then-fetch hit the same hosts repeatedly; skip the extra lookups.
+_DNS_CACHE = {}
+
+# Pre-compiled regex patterns used by clean_html and the search parser.
+# Compiling once at import time avoids the per-call lookup in re's pattern cache.
+_JUNK_LINE = re.compile(r'^[\s*=\-_+.,;:]*$')
+_RE_NUM_GT = re.compile(r'[0-9]+\s*\>')
+_RE_CODE_JUNK = re.compile(r'minProd\)\s*&&\s*\(\$index')
+
+# Literal anchor prefix of a DuckDuckGo result link; the results page is a
+# fixed template, so a substring scan is enough to pull the URLs out
+_DDG_NEEDLE = '<a rel="nofollow" href="'
+
+# Tag classification for the single-pass scanner in clean_html_streaming
+_BLOCK_OPEN_TAGS = frozenset({'div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                              'tr', 'td', 'li', 'ul', 'ol'})
+_PARA_CLOSE_TAGS = frozenset({'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+_LINE_CLOSE_TAGS = frozenset({'div', 'tr', 'li'})
+
+# Ensure cache directory exists
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+# In-process memo over the file cache: url -> (timestamp, content).
+# Repeat hits within one run skip the stat/read/decode entirely.
+_MEM_CACHE = {}
+
+
+def _cache_key(url):
+    """Generate a unique, filesystem-safe cache key for a given URL.
+
+    BLAKE2b-128 is plenty for collision-avoidance among cached URLs and is
+    noticeably cheaper than SHA-256, with shorter filenames as a bonus.
+    """
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+
+def get_from_cache(url):
+    """Retrieve cached response from file if it is still valid."""
+    hit = _MEM_CACHE.get(url)
+    if hit and time.time() - hit[0] < CACHE_EXPIRATION:
+        print(f"[CACHE HIT] Returning cached response for {url}")
+        return hit[1]
+
+    cache_key = _cache_key(url)
+    cache_file = os.path.join(CACHE_DIR, cache_key + ".txt")
+
+    try:
+        # The file's mtime doubles as the cache timestamp
+        if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < CACHE_EXPIRATION:
+            print(f"[CACHE HIT] Returning cached response for {url}")
+            with open(cache_file, 'rb') as f:
+                content = f.read().decode('utf-8')
+            _MEM_CACHE[url] = (os.path.getmtime(cache_file), content)
+            return content
+
+    except IOError as e:
+        print(f"Cache read error: {e}")
+
+    return None
+
+
+def store_in_cache(url, response):
+    """Store the response as raw UTF-8 bytes; expiry is tracked via file mtime."""
+    cache_key = _cache_key(url)
+    cache_file = os.path.join(CACHE_DIR, cache_key + ".txt")
+
+    try:
+        with open(cache_file, 'wb') as f:
+            f.write(response.encode('utf-8'))
+        _MEM_CACHE[url] = (time.time(), response)
+    except IOError as e:
+        print(f"Cache write error: {e}")
+
+
+def parse_content(headers, body, content_type):
+    """
+    Parse content based on content type.
+
+    Args:
+        headers (str): HTTP headers
+        body (bytes): Response body
+        content_type (str): Content-Type header value
+
+    Returns:
+        str: Parsed and cleaned content
+    """
+    body_text = body.decode(errors="ignore")
+
+    if 'application/json' in content_type.lower():
+        # JSON parsing
+        try:
+            # Try to pretty print JSON
+            parsed_json = json.loads(body_text)
+            return json.dumps(parsed_json, indent=2)
+        except json.JSONDecodeError:
+            return body_text
+
+    elif 'text/html' in content_type.lower():
+        # HTML cleaning (existing method)
+        return clean_html(body_text)
+
+    elif 'text/plain' in content_type.lower():
+        # Plain text, return as-is
+        return body_text
+
+    # Default fallback
+    return body_text
+
+
+def _parse_headers(header_block):
+    """Parse the raw header block (status line included) into a case-insensitive
+    mapping, using the C-accelerated stdlib parser on just the header region."""
+    _, _, header_bytes = header_block.partition(b"\r\n")  # drop the status line
+    return email.parser.BytesParser().parsebytes(header_bytes)
+
+
+async def _read_response(reader):
+    """Read one HTTP response from the stream.
+
+    Uses Content-Length (or the chunked terminator) to find the end of the
+    response so the connection can stay open for keep-alive reuse. Returns
+    (response_bytes, reusable, headers) where reusable means the response
+    boundary was known and the socket can carry another request; headers is
+    the parsed header mapping (None if the headers never completed).
+    """
+    buf = bytearray()
+    header_end = -1
+    while header_end < 0:
+        chunk = await reader.read(65536)
+        if not chunk:
+            return bytes(buf), False, None
+        buf.extend(chunk)
+        header_end = buf.find(b"\r\n\r\n")
+
+    headers = _parse_headers(bytes(buf[:header_end]))
+
+    # A server announcing Connection: close will tear the socket down after
+    # this response, so it must not be reused even when the framing is known
+    keep_alive = headers.get('Connection', '').strip().lower() != 'close'
+
+    if headers.get('Content-Length', '').strip().isdigit():
+        # readexactly pulls the remaining bytes straight out of the
+        # transport's own receive buffer, with no per-64KB Python loop
+        end = header_end + 4 + int(headers['Content-Length'])
+        remaining = end - len(buf)
+        if remaining > 0:
+            try:
+                buf.extend(await reader.readexactly(remaining))
+            except asyncio.IncompleteReadError as e:
+                buf.extend(e.partial)
+                return bytes(buf), False, headers
+        return bytes(buf[:end]), keep_alive, headers
+
+    if headers.get('Transfer-Encoding', '').strip().lower() == 'chunked':
+        # Decode the chunk framing: hex size line, payload, CRLF, repeated
+        # until a zero-size chunk. Stops at the known end instead of waiting
+        # for the server to close, and returns a de-chunked body.
+        head = bytes(buf[:header_end + 4])
+        body = bytearray()
+        pos = header_end + 4
+
+        async def _fill(target):
+            need = target - len(buf)
+            if need <= 0:
+                return True
+            try:
+                buf.extend(await reader.readexactly(need))
+            except asyncio.IncompleteReadError as e:
+                buf.extend(e.partial)
+                return False
+            return True
+
+        async def _find_crlf(start):
+            end = buf.find(b"\r\n", start)
+            while end < 0:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return -1
+                buf.extend(chunk)
+                end = buf.find(b"\r\n", start)
+            return end
+
+        while True:
+            line_end = await _find_crlf(pos)
+            if line_end < 0:
+                return head + bytes(body), False, headers
+            try:
+                size = int(bytes(buf[pos:line_end]).split(b";")[0], 16)
+            except ValueError:
+                return head + bytes(body), False, headers
+            pos = line_end + 2
+
+            if size == 0:
+                # Consume (usually empty) trailers up to the final blank line
+                while True:
+                    end = await _find_crlf(pos)
+                    if end < 0:
+                        return head + bytes(body), False, headers
+                    blank = (end == pos)
+                    pos = end + 2
+                    if blank:
+                        return head + bytes(body), keep_alive, headers
+
+            if not await _fill(pos + size + 2):
+                body += buf[pos:]
+                return head + bytes(body), False, headers
+            body += buf[pos:pos + size]
+            pos += size + 2
+
+    # No framing information: drain until the server closes
+    while True:
+        chunk = await reader.read(65536)
+        if not chunk:
+            return bytes(buf), False, headers
+        buf.extend(chunk)
+
+
+async def _resolve(host, port):
+    """Resolve host to an IP once and cache the answer for DNS_TTL seconds."""
+    hit = _DNS_CACHE.get(host)
+    if hit and time.time() - hit[0] < DNS_TTL:
+        return hit[1]
+
+    loop = asyncio.get_running_loop()
+    info = await loop.getaddrinfo(host, port, family=socket.AF_INET,
+                                  type=socket.SOCK_STREAM)
+    ip = info[0][4][0]
+    _DNS_CACHE[host] = (time.time(), ip)
+    return ip
+
+
+async def _close(writer):
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+
+async def _fetch(host, path, is_https=False, redirect_count=0, conn=None):
+    """Asynchronously performs an HTTP GET request, handling HTTPS and relative/absolute redirections.
+
+    Same-host redirects reuse the already-open keep-alive connection (passed
+    via conn) instead of paying a fresh TCP/TLS handshake.
+    """
+
+    if redirect_count > MAX_REDIRECTS:
+        if conn:
+            await _close(conn[1])
+        return "Error: Too many redirects"
+
+    # Normalize path
+    path = path if path.startswith("/") else "/" + path
+    url = f"{'https' if is_https else 'http'}://{host}{path}"
+
+    try:
+        if conn:
+            reader, writer = conn
+        else:
+            # Netloc may carry an explicit port (e.g. from _fetch_url)
+            hostname, _, explicit_port = host.partition(":")
+            port = int(explicit_port) if explicit_port else (443 if is_https else 80)
+            context = ssl.create_default_context() if is_https else None
+            ip = await _resolve(hostname, port)
+            reader, writer = await asyncio.open_connection(
+                ip, port, ssl=context,
+                server_hostname=hostname if is_https else None)
+
+        # HTTP request: gathered write of the two variable parts plus the
+        # pre-encoded constant header tail, no f-string assembly per call
+        writer.writelines([
+            b"GET ", path.encode(), b" HTTP/1.1\r\nHost: ",
+            host.encode(), _REQ_SUFFIX,
+        ])
+        await writer.drain()
+
+        response, reusable, headers = await _read_response(reader)
+
+        # Parse the status code off the first line only; no need to decode or
+        # scan the (possibly large) body to spot a redirect
+        status_line, _, _ = response.partition(b"\r\n")
+        parts = status_line.split(b" ", 2)
+        try:
+            status_code = int(parts[1])
+        except (IndexError, ValueError):
+            status_code = 0
+
+        # Handle redirection (301, 302)
+        if status_code in (301, 302):
+            location = headers['Location'] if headers else None
+            if location:
+                redirect_url = location.strip()
+                print(f"Redirecting to: {redirect_url}")
+
+                # Resolve relative paths
+                redirect_url = urllib.parse.urljoin(url, redirect_url)
+                parsed_url = urllib.parse.urlparse(redirect_url)
+                same_origin = (parsed_url.netloc == host
+                               and (parsed_url.scheme == "https") == is_https)
+
+                if not (same_origin and reusable):
+                    await _close(writer)
+                return await _fetch(parsed_url.netloc, parsed_url.path or "/",
+                                    is_https=(parsed_url.scheme == "https"),
+                                    redirect_count=redirect_count + 1,
+                                    conn=(reader, writer) if same_origin and reusable else None)
+
+        await _close(writer)
+
+        # Extract body (content type defaults to text/html if not specified)
+        _, _, body = response.partition(b"\r\n\r\n")
+        content_type = headers['Content-Type'] if headers and headers['Content-Type'] else "text/html"
+
+        return body.decode(errors="ignore")  # Returning content
+
+    except Exception as e:
+        return f"Error: {e}"
+
+
+async def _fetch_url(url):
+    """Fetch a full URL by splitting it into host/path and dispatching to _fetch."""
+    parsed = urllib.parse.urlparse(url if "://" in url else "http://" + url)
+    return await _fetch(parsed.netloc, parsed.path or "/",
+                        is_https=(parsed.scheme == "https"))
+
+
+def make_http_request(host, path, is_https=False):
+    """Synchronous wrapper around the asyncio fetch for single-URL use."""
+    return asyncio.run(_fetch(host, path, is_https=is_https))
+
+
+def clean_html_streaming(page):
+    """Tag stripping, entity decoding, whitespace collapsing and junk-line
+    filtering fused into one left-to-right walk over the page.
+
+    Tags and script/style bodies are only ever touched once; text runs are
+    gathered per output line and finished in place, so the buffer is no longer
+    re-scanned by a separate pass per cleanup step.
+    """
+    out = []   # finished output lines
+    segs = []  # raw text segments of the line being built
+
+    def end_line():
+        if not segs:
+            return
+        # Entity decode + whitespace collapse only over this line's text
+        line = ' '.join(html.unescape(''.join(segs)).split())
+        segs.clear()
+        if line and not _JUNK_LINE.match(line):
+            out.append(line)
+
+    def emit_text(run):
+        # Newlines in the source are line boundaries, like the old split('\n')
+        if '\n' not in run:
+            segs.append(run)
+            return
+        first, *rest = run.split('\n')
+        segs.append(first)
+        end_line()
+        for part in rest[:-1]:
+            segs.append(part)
+            end_line()
+        segs.append(rest[-1])
+
+    i = 0
+    n = len(page)
+    while i < n:
+        j = page.find('<', i)
+        if j < 0:
+            emit_text(page[i:])
+            break
+        emit_text(page[i:j])
+        k = page.find('>', j + 1)
+        if k < 0:
+            break  # Truncated tag, drop the remainder
+
+        tag = page[j + 1:k]
+        is_close = tag.startswith('/')
+        name = tag[1:] if is_close else tag
+        name = name.split(None, 1)[0].rstrip('/').lower() if name else ''
+
+        if not is_close and name in ('script', 'style'):
+            # Skip straight to the matching close tag
+            close = page.find('</' + name, k + 1)
+            if close < 0:
+                break
+            k = page.find('>', close)
+            if k < 0:
+                break
+            segs.append(' ')
+        elif is_close:
+            if name in _PARA_CLOSE_TAGS or name in _LINE_CLOSE_TAGS:
+                end_line()
+        elif name == 'br' or name in _BLOCK_OPEN_TAGS:
+            end_line()
+
+        i = k + 1
+
+    end_line()
+    return '\n'.join(out)
+
+
+def clean_html(text):
+    """Removes HTML tags and cleans up the text for better readability with trimmed output."""
+    if _SelectolaxParser is not None:
+        # C-backed parse: tag stripping and entity decoding in one go
+        body = _SelectolaxParser(text).body
+        text = body.text(separator='\n', strip=True) if body is not None else ''
+
+        # Per-line cleanup: collapse whitespace and drop junk-only lines
+        text = '\n'.join(
+            line for line in (' '.join(raw.split()) for raw in text.split('\n'))
+            if line and not _JUNK_LINE.match(line))
+    else:
+        # Fused single-pass path: one walk does tags, entities, whitespace
+        # and line filtering
+        text = clean_html_streaming(text)
+
+    # Remove common junk text patterns (customize as needed)
+    text = _RE_NUM_GT.sub('', text)  # Remove patterns like "767>"
+    text = _RE_CODE_JUNK.sub('', text)  # Remove code fragments
+
+    return text.strip()
+
+
+def _extract_ddg(page, n=10):
+    """Extract up to n result URLs by scanning for the literal anchor prefix.
+
+    One str.find per result (memchr-backed) replaces the regex scan of the
+    whole page; no HTML parsing or entity decoding is needed for the URLs.
+    """
+    links = []
+    seen = set()
+    start = len(_DDG_NEEDLE)
+    i = 0
+    while len(links) < n:
+        j = page.find(_DDG_NEEDLE, i)
+        if j < 0:
+            break
+        k = page.find('"', j + start)
+        if k < 0:
+            break
+        url = page[j + start:k]
+        if url.startswith(('http://', 'https://')) and url not in seen:
+            seen.add(url)
+            links.append(url)
+        i = k + 1
+    return links
+
+
+def search_duckduckgo(query):
+    """Search DuckDuckGo and return the first 10 results."""
+    encoded_query = urllib.parse.quote(query)
+    search_path = f"/html/?q={encoded_query}"
+
+    cached_response = get_from_cache(search_path)
+    if cached_response:
+        return cached_response
+
+    response = make_http_request("html.duckduckgo.com", search_path)
+    links = _extract_ddg(response)
+
+    if not links:
+        return "No results found."
+
+    result = "\n".join(links)
+    store_in_cache(search_path, result)
+    return result
+
+
+async def _search_and_fetch(query, n=10):
+    """Search DuckDuckGo, then fetch the top-n result pages concurrently."""
+    encoded_query = urllib.parse.quote(query)
+    search_path = f"/html/?q={encoded_query}"
+
+    response = await _fetch("html.duckduckgo.com", search_path)
+    links = _extract_ddg(response, n)
+
+    if not links:
+        return "No results found."
+
+    pages = await asyncio.gather(*[_fetch_url(link) for link in links])
+
+    sections = []
+    for link, page in zip(links, pages):
+        sections.append(f"=== {link} ===\n{clean_html(page)}")
+    return "\n\n".join(sections)
+
+
+def search_and_fetch(query, n=10):
+    """Synchronous wrapper: search and dereference the top-n links in parallel."""
+    return asyncio.run(_search_and_fetch(query, n))